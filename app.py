@@ -3,11 +3,22 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-import numpy as np
 import pickle
 import os
 import hashlib
 from datetime import datetime
+from schema import read_transactions
+from rfm import compute_rfm, summarize_rfm, rfm_trend, segment_transitions, SNAPSHOT_FREQUENCIES, METRICS, SUMMARY_QUANTILES
+from batch import score_batch, directory_files, unique_sources, segment_columns
+from rfm_sql import compute_rfm_sql, transaction_bounds, DUCKDB_AVAILABLE
+
+#execution backends
+PANDAS_BACKEND = "pandas (in-memory)"
+DUCKDB_BACKEND = "DuckDB (on-disk)"
+
+#directory users may read data files from by name, the app's own directory unless RFM_DATA_DIR is set
+DATA_DIR = os.path.realpath(os.environ.get("RFM_DATA_DIR", os.path.dirname(os.path.abspath(__file__))))
+DATA_EXTENSIONS = ('.csv', '.parquet')
 
 #page config
 st.set_page_config(page_title="RFM Analysis Dashboard", page_icon="📊", layout="wide")
@@ -79,9 +90,48 @@ def authenticate(username, password):
 #load data
 @st.cache_data 
 def load_data():
-    df = pd.read_csv('supermarket_sales.csv')
-    df['Date'] = pd.to_datetime(df['Date'])
-    return df
+    return read_transactions('supermarket_sales.csv')
+
+#resolve a user-entered path inside DATA_DIR, None if it points anywhere else
+def resolve_data_path(path):
+    resolved = os.path.realpath(os.path.join(DATA_DIR, path))
+    if os.path.commonpath([resolved, DATA_DIR]) != DATA_DIR:
+        return None
+    return resolved
+
+#date and amount ranges of an on-disk file, modified keeps the cache fresh when the file changes
+@st.cache_data
+def load_bounds(data_path, modified):
+    return transaction_bounds(data_path)
+
+#RFM computed by DuckDB, cached so widget reruns do not rescan the file, a few filter combinations only
+@st.cache_data(max_entries=8)
+def load_rfm_sql(data_path, modified, date_range, transaction_amount):
+    return compute_rfm_sql(data_path, date_range, transaction_amount)
+
+#segment, score and global aggregates, bounded like the rfm frames they are keyed on
+@st.cache_data(max_entries=8)
+def load_summary(rfm):
+    return summarize_rfm(rfm)
+
+#box plot from precomputed min/quartiles/max
+def quantile_box(quantiles):
+    fig_box = go.Figure()
+    for metric in METRICS:
+        fig_box.add_trace(go.Box(
+            name=metric,
+            lowerfence=[quantiles.loc[0, metric]],
+            q1=[quantiles.loc[0.25, metric]],
+            median=[quantiles.loc[0.5, metric]],
+            q3=[quantiles.loc[0.75, metric]],
+            upperfence=[quantiles.loc[1, metric]]
+        ))
+    return fig_box
+
+#RFM trend across snapshots, a few entries only since each holds every customer at every snapshot
+@st.cache_data(max_entries=4)
+def load_trend(filtered_df, freq):
+    return rfm_trend(filtered_df, freq)
 
 #login page
 def auth_page():
@@ -179,6 +229,159 @@ def auth_page():
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+#segment trends across snapshots
+def trends_tab(filtered_df):
+    #tabs all run on every rerun, so the trend is only computed once asked for
+    if not st.toggle("Calculate segment trends", key='trends_toggle'):
+        st.info("Turn on to compute RFM and segments at every week or month of the selected range.")
+        return
+
+    snapshot_label = st.selectbox("Snapshot Frequency", options=list(SNAPSHOT_FREQUENCIES), index=1)
+
+    try:
+        trend = load_trend(filtered_df, SNAPSHOT_FREQUENCIES[snapshot_label])
+    except Exception as e:
+        st.error(f"Error calculating RFM trend: {e}")
+        return
+
+    #segment sizes over time
+    try:
+        trend_counts = trend.groupby(['Snapshot', 'Segment'], observed=True).size().reset_index(name='Count')
+        fig_trend = px.area(
+            trend_counts,
+            x='Snapshot',
+            y='Count',
+            color='Segment',
+            title=f"{snapshot_label} Customer Segment Sizes",
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )
+        st.plotly_chart(fig_trend, use_container_width=True)
+    except Exception as e:
+        st.error(f"Error creating segment trend chart: {e}")
+
+    #transition matrix between two snapshots
+    snapshots = list(pd.DatetimeIndex(trend['Snapshot'].unique()).sort_values().date)
+    if len(snapshots) < 2:
+        st.info("Select a wider date range to compare segments between snapshots.")
+    else:
+        from_col, to_col = st.columns(2)
+        with from_col:
+            from_snapshot = st.selectbox("From Snapshot", options=snapshots[:-1], index=len(snapshots) - 2)
+        with to_col:
+            to_options = [snapshot for snapshot in snapshots if snapshot > from_snapshot]
+            to_snapshot = st.selectbox("To Snapshot", options=to_options)
+
+        try:
+            transitions = segment_transitions(trend, pd.Timestamp(from_snapshot), pd.Timestamp(to_snapshot))
+            fig_transitions = px.imshow(
+                transitions,
+                text_auto=True,
+                color_continuous_scale='Blues',
+                labels=dict(x="Segment at " + str(to_snapshot), y="Segment at " + str(from_snapshot), color="Customers"),
+                title="Segment Transition Matrix"
+            )
+            st.plotly_chart(fig_transitions, use_container_width=True)
+        except Exception as e:
+            st.error(f"Error creating transition matrix: {e}")
+
+#batch scoring of one transactions file per store
+def multi_store_tab():
+    st.subheader("Multi-Store Batch Scoring")
+
+    store_files = st.file_uploader(
+        "Upload one CSV per store", type=["csv"], accept_multiple_files=True, key='store_files_uploader'
+    )
+    store_directory = st.text_input(
+        "Or score every CSV in a folder of the data directory", "", key='store_directory_input'
+    )
+
+    if st.button("Score Stores", key='score_stores_button'):
+        store_sources = [(os.path.splitext(store_file.name)[0], store_file.getvalue()) for store_file in store_files]
+        if store_directory:
+            directory_path = resolve_data_path(store_directory)
+            if directory_path is None or not os.path.isdir(directory_path):
+                st.error(f"Please enter a folder inside the data directory, '{store_directory}' is not one.")
+                return
+            try:
+                store_sources += directory_files(directory_path)
+            except Exception as e:
+                st.error(f"Error reading directory: {e}")
+                return
+
+        #keep every file when store names collide, numbering the later ones
+        store_names = [store for store, _ in store_sources]
+        repeated = sorted({store for store in store_names if store_names.count(store) > 1})
+        if repeated:
+            st.warning(f"More than one file is named {', '.join(repeated)}, the later ones are scored as 'name (2)', 'name (3)', ...")
+        sources = unique_sources(store_sources)
+
+        if not sources:
+            st.warning("Upload store files or enter a directory to score.")
+            return
+
+        try:
+            st.session_state["batch_results"] = score_batch(sources)
+        except Exception as e:
+            st.error(f"Error scoring stores: {e}")
+            return
+
+    #keep results across reruns so the store selector works
+    if "batch_results" not in st.session_state:
+        st.info("Upload store files or enter a directory, then click Score Stores.")
+        return
+    stores, summary, quartile_edges = st.session_state["batch_results"]
+
+    empty_stores = summary.index[summary['Customers'] == 0].tolist()
+    if empty_stores:
+        st.warning(f"No transactions found for: {', '.join(empty_stores)}. Their averages are left blank.")
+
+    st.markdown("### Cross-Store Summary")
+    st.markdown(summary.round(2).to_html(), unsafe_allow_html=True)
+
+    #segment counts per store
+    try:
+        store_segments = summary.drop(index='All Stores')[segment_columns(summary)].reset_index().melt(
+            id_vars='Store', var_name='Segment', value_name='Count'
+        )
+        fig_stores = px.bar(
+            store_segments,
+            x='Store',
+            y='Count',
+            color='Segment',
+            title='Customer Segments by Store',
+            color_discrete_sequence=px.colors.qualitative.Bold
+        )
+        st.plotly_chart(fig_stores, use_container_width=True)
+    except Exception as e:
+        st.error(f"Error creating store segment chart: {e}")
+
+    st.markdown("### Global Quartile Edges")
+    st.markdown(quartile_edges.round(2).to_html(), unsafe_allow_html=True)
+
+    #per-store RFM table
+    selected_store = st.selectbox("Select Store", options=list(stores), key='store_select')
+    st.markdown(stores[selected_store].head(50).to_html(index=False), unsafe_allow_html=True)
+
+    st.subheader("Export Data")
+    try:
+        st.download_button(
+            "Download Cross-Store Summary",
+            summary.to_csv().encode('utf-8'),
+            "store_summary.csv",
+            "text/csv",
+            key='download_store_summary_button'
+        )
+    except Exception as e:
+        st.error(f"Error creating download button: {e}")
+
+
+#the RFM pipeline cannot continue, Multi-Store scoring reads its own files so it still renders
+def stop_pipeline():
+    st.divider()
+    multi_store_tab()
+    st.stop()
+
+
 def main():
     #display logo 
     display_logo()
@@ -191,23 +394,45 @@ def main():
             st.session_state["username"] = None
             st.rerun()
     
-    #upload file 
-    uploaded_file = st.sidebar.file_uploader("Upload your customer data CSV", type=["csv"])
-    if uploaded_file:
-        try:
-            df = pd.read_csv(uploaded_file)
-            df['Date'] = pd.to_datetime(df['Date'])
-            st.sidebar.success("Upload Successful")
-        except Exception as e:
-            st.sidebar.error(f"Error uploading file: {e}")
-            df = load_data()
-    else:
+    #execution backend
+    backend_options = [PANDAS_BACKEND] + ([DUCKDB_BACKEND] if DUCKDB_AVAILABLE else [])
+    backend = st.sidebar.radio("Execution Backend", backend_options, key='backend_radio')
+
+    if backend == DUCKDB_BACKEND:
+        #DuckDB reads the file from disk, so only the RFM result is held in memory
+        data_name = st.sidebar.text_input("Data File in the Data Directory (CSV or Parquet)", "supermarket_sales.csv")
+        data_path = resolve_data_path(data_name)
+        if data_path is None or not data_path.lower().endswith(DATA_EXTENSIONS) or not os.path.isfile(data_path):
+            st.error(f"Please enter a CSV or Parquet file inside the data directory, '{data_name}' is not one.")
+            stop_pipeline()
+
         try:
-            df = load_data()
+            data_modified = os.path.getmtime(data_path)
+            min_date, max_date, min_total, max_total = load_bounds(data_path, data_modified)
         except Exception as e:
             st.error(f"Error loading data: {e}")
-            st.error("Please make sure 'supermarket_sales.csv' exists in the current directory.")
-            st.stop()
+            st.error(f"Please make sure '{data_name}' has Invoice ID, Date and Total columns.")
+            stop_pipeline()
+    else:
+        #upload file 
+        uploaded_file = st.sidebar.file_uploader("Upload your customer data CSV", type=["csv"])
+        if uploaded_file:
+            try:
+                df = read_transactions(uploaded_file)
+                st.sidebar.success("Upload Successful")
+            except Exception as e:
+                st.sidebar.error(f"Error uploading file: {e}")
+                df = load_data()
+        else:
+            try:
+                df = load_data()
+            except Exception as e:
+                st.error(f"Error loading data: {e}")
+                st.error("Please make sure 'supermarket_sales.csv' exists in the current directory.")
+                stop_pipeline()
+
+        min_date, max_date = df['Date'].min(), df['Date'].max()
+        min_total, max_total = df['Total'].min(), df['Total'].max()
 
     #title and description
     st.title("📊 RFM Analysis Dashboard")
@@ -225,140 +450,74 @@ def main():
     try:
         date_range = st.sidebar.date_input(
             "Select Date Range",
-            value=(df['Date'].min().date(), df['Date'].max().date()),
-            min_value=df['Date'].min().date(),
-            max_value=df['Date'].max().date(),
+            value=(min_date.date(), max_date.date()),
+            min_value=min_date.date(),
+            max_value=max_date.date(),
             key='date_range_filter'
         )
     except Exception as e:
         st.sidebar.error(f"Error with date input: {e}")
-        st.stop()
+        stop_pipeline()
 
     #slider
     try:
         transaction_amount = st.sidebar.slider(
             "Transaction Amount Range",
-            min_value=float(df['Total'].min()),
-            max_value=float(df['Total'].max()),
-            value=(float(df['Total'].min()), float(df['Total'].max())),
+            min_value=float(min_total),
+            max_value=float(max_total),
+            value=(float(min_total), float(max_total)),
             key='transaction_amount_slider'
         )
     except Exception as e:
         st.sidebar.error(f"Error with slider: {e}")
-        st.stop()
-
-    #data filter
-    filtered_df = df[
-        (df['Date'] >= pd.to_datetime(date_range[0])) & 
-        (df['Date'] <= pd.to_datetime(date_range[1])) &
-        (df['Total'].between(transaction_amount[0], transaction_amount[1]))
-    ]
-
-    if filtered_df.empty:
-        st.warning("No data matches the current filters. Please adjust your selection.")
-        st.stop()
-
-    #RFM Calculation
-    current_date = filtered_df['Date'].max()
-
-    invoice_ids = filtered_df['Invoice ID'].unique()
-
-    #lists to store results
-    recency_values = []
-    frequency_values = []
-    monetary_values = []
-    invoice_id_list = []
-
-    #calculate RFM
-    for invoice_id in invoice_ids:
-        invoice_data = filtered_df[filtered_df['Invoice ID'] == invoice_id]
-        
-        #recency
-        latest_date = invoice_data['Date'].max()
-        recency = (current_date - latest_date).days
-        
-        #frequency 
-        frequency = len(invoice_data)
-        
-        #monetary 
-        monetary = invoice_data['Total'].sum()
-        
-        #append
-        invoice_id_list.append(invoice_id)
-        recency_values.append(recency)
-        frequency_values.append(frequency)
-        monetary_values.append(monetary)
-
-    #RFM DataFrame
-    rfm_data = {
-        'Invoice ID': invoice_id_list,
-        'Recency': recency_values,
-        'Frequency': frequency_values,
-        'Monetary': monetary_values
-    }
-    rfm = pd.DataFrame(rfm_data)
+        stop_pipeline()
 
-    #bins 
-    recency_bins = [0, 30, 90, 180, 365]  
-    frequency_bins = [1, 2, 5, 10, 20]    
-    monetary_bins = [0, 500, 1000, 5000, 10000]  
+    if backend == DUCKDB_BACKEND:
+        #RFM Calculation in DuckDB
+        try:
+            rfm = load_rfm_sql(data_path, data_modified, tuple(date_range), tuple(transaction_amount))
+        except Exception as e:
+            st.error(f"Error creating RFM segments: {e}")
+            stop_pipeline()
 
-    #labels
-    recency_labels = ['1', '2', '3', '4']
-    frequency_labels = ['4', '3', '2', '1']
-    monetary_labels = ['4', '3', '2', '1']
+        if rfm.empty:
+            st.warning("No data matches the current filters. Please adjust your selection.")
+            stop_pipeline()
+    else:
+        #data filter
+        filtered_df = df[
+            (df['Date'] >= pd.to_datetime(date_range[0])) & 
+            (df['Date'] <= pd.to_datetime(date_range[1])) &
+            (df['Total'].between(transaction_amount[0], transaction_amount[1]))
+        ]
+
+        if filtered_df.empty:
+            st.warning("No data matches the current filters. Please adjust your selection.")
+            stop_pipeline()
+
+        #RFM Calculation
+        try:
+            rfm = compute_rfm(filtered_df)
+        except Exception as e:
+            st.error(f"Error creating RFM segments: {e}")
+            stop_pipeline()
 
-    #segmenting with pd.cut
+    #aggregates shared by all tabs
     try:
-        rfm['R'] = pd.cut(rfm['Recency'], bins=recency_bins, labels=recency_labels, include_lowest=True)
-        rfm['F'] = pd.cut(rfm['Frequency'], bins=frequency_bins, labels=frequency_labels, include_lowest=True)
-        rfm['M'] = pd.cut(rfm['Monetary'], bins=monetary_bins, labels=monetary_labels, include_lowest=True)
-        
-        #convert to string 
-        rfm['R'] = rfm['R'].astype(str)
-        rfm['F'] = rfm['F'].astype(str)
-        rfm['M'] = rfm['M'].astype(str)
-        
-        rfm['R'] = rfm['R'].replace('nan', 'Other')
-        rfm['F'] = rfm['F'].replace('nan', 'Other')
-        rfm['M'] = rfm['M'].replace('nan', 'Other')
+        summary = load_summary(rfm)
     except Exception as e:
-        st.error(f"Error creating RFM segments: {e}")
-
-    #RFM combined score
-    rfm['RFM_Score'] = rfm['R'] + rfm['F'] + rfm['M']
-    
-    #customer segment based on RFM score
-    def assign_segment(row):
-        score = row['RFM_Score']
-        r_score = int(row['R']) if row['R'] != 'Other' else 0
-        f_score = int(row['F']) if row['F'] != 'Other' else 0
-        m_score = int(row['M']) if row['M'] != 'Other' else 0
-        
-        #Loyal Customers
-        if r_score >= 2 and f_score >= 3 and m_score >= 3:
-            return 'Loyal Customers'
-        #At Risk
-        elif r_score <= 2 and f_score >= 2:
-            return 'At Risk'
-        #New Customers 
-        elif frequency_values[invoice_id_list.index(row['Invoice ID'])] <= 2:
-            return 'New Customers'
-        else:
-            return 'Others'
-    
-    #apply segment function
-    rfm['Segment'] = rfm.apply(assign_segment, axis=1)
+        st.error(f"Error summarizing RFM segments: {e}")
+        stop_pipeline()
 
     #dashboard tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["Dashboard", "Data Explorer", "Customer Segments", "About"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Dashboard", "Data Explorer", "Customer Segments", "Trends", "Multi-Store", "About"])
     
     with tab1:
-        #calculate and display metrics
-        total_customers = len(rfm)
-        average_recency = np.mean(rfm['Recency'])
-        average_frequency = np.mean(rfm['Frequency'])
-        average_monetary = np.mean(rfm['Monetary'])
+        #display metrics from the shared summary
+        total_customers = int(summary['total']['Count'])
+        average_recency = summary['total']['Recency']
+        average_frequency = summary['total']['Frequency']
+        average_monetary = summary['total']['Monetary']
 
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("Total Customers", total_customers)
@@ -369,7 +528,8 @@ def main():
         #pie chart
         try:
             st.subheader("Customer Segment Distribution")
-            segment_counts = rfm['Segment'].value_counts().reset_index()
+            #largest segments first, as the pie has always been drawn
+            segment_counts = summary['segments']['Count'].sort_values(ascending=False, kind='stable').reset_index()
             segment_counts.columns = ['Segment', 'Count']
             
             fig_segment = px.pie(
@@ -390,7 +550,7 @@ def main():
             r_col, f_col, m_col = st.columns(3)
             
             with r_col:
-                r_counts = rfm['R'].value_counts().reset_index()
+                r_counts = summary['r_counts'].reset_index()
                 r_counts.columns = ['R_Score', 'Count']
                 
                 fig_r = px.pie(
@@ -404,7 +564,7 @@ def main():
                 st.plotly_chart(fig_r, use_container_width=True)
             
             with f_col:
-                f_counts = rfm['F'].value_counts().reset_index()
+                f_counts = summary['f_counts'].reset_index()
                 f_counts.columns = ['F_Score', 'Count']
                 
                 fig_f = px.pie(
@@ -418,7 +578,7 @@ def main():
                 st.plotly_chart(fig_f, use_container_width=True)
             
             with m_col:
-                m_counts = rfm['M'].value_counts().reset_index()
+                m_counts = summary['m_counts'].reset_index()
                 m_counts.columns = ['M_Score', 'Count']
                 
                 fig_m = px.pie(
@@ -437,12 +597,7 @@ def main():
         try:
             st.subheader("RFM Score Distribution")
             
-            score_counts = rfm['RFM_Score'].value_counts()
-            top_scores = score_counts.nlargest(7).index.tolist()
-            
-            rfm['Score_Group'] = rfm['RFM_Score'].apply(lambda x: x if x in top_scores else 'Other Scores')
-            
-            score_group_counts = rfm['Score_Group'].value_counts().reset_index()
+            score_group_counts = summary['score_groups'].reset_index()
             score_group_counts.columns = ['RFM_Score', 'Count']
             
             #create pie chart
@@ -492,7 +647,7 @@ def main():
         with filter_col:
             segment_filter = st.multiselect(
                 "Filter by Segment",
-                options=['All'] + list(rfm['Segment'].unique()),
+                options=['All'] + list(summary['segments'].index),
                 default=['All']
             )
         
@@ -534,15 +689,9 @@ def main():
         }
         
         #segment metrics
-        segment_metrics = rfm.groupby('Segment').agg({
-            'Recency': 'mean',
-            'Frequency': 'mean',
-            'Monetary': 'mean',
-            'Invoice ID': 'count'
-        }).reset_index()
+        segment_metrics = summary['segments'].reset_index()
         
         segment_metrics = segment_metrics.rename(columns={
-            'Invoice ID': 'Count',
             'Recency': 'Avg Days Since Purchase',
             'Frequency': 'Avg Purchase Frequency',
             'Monetary': 'Avg Spend ($)'
@@ -564,13 +713,12 @@ def main():
         
        
         if selected_segment == 'New Customers' and 'New Customers' not in segment_metrics['Segment'].values:
+            #metrics for New Customers, rows are only filtered for this rare fallback
             new_customers = rfm[rfm['Frequency'] <= 2]
-            
-            #metrics for New Customers
-            new_customers_count = len(new_customers)
-            avg_recency = np.mean(new_customers['Recency']) if len(new_customers) > 0 else 0
-            avg_frequency = np.mean(new_customers['Frequency']) if len(new_customers) > 0 else 0
-            avg_monetary = np.mean(new_customers['Monetary']) if len(new_customers) > 0 else 0
+            new_customers_count = int(summary['new_customers']['Count'])
+            avg_recency = summary['new_customers']['Recency']
+            avg_frequency = summary['new_customers']['Frequency']
+            avg_monetary = summary['new_customers']['Monetary']
             
             st.markdown(f"### {selected_segment}")
             st.markdown(f"**Description**: {segment_descriptions.get(selected_segment, 'Customers who purchased recently but not made many purchases as yet')}")
@@ -615,22 +763,14 @@ def main():
         try:
             if selected_segment == 'New Customers' and 'New Customers' not in segment_metrics['Segment'].values:
                 #distribution for new customers
-                if len(new_customers) > 0:
-                    fig_box = go.Figure()
-                    fig_box.add_trace(go.Box(y=new_customers['Recency'], name="Recency"))
-                    fig_box.add_trace(go.Box(y=new_customers['Frequency'], name="Frequency"))
-                    fig_box.add_trace(go.Box(y=new_customers['Monetary'], name="Monetary"))
+                if new_customers_count > 0:
+                    fig_box = quantile_box(new_customers[METRICS].quantile(SUMMARY_QUANTILES))
                     fig_box.update_layout(title=f"Distribution of RFM Metrics for {selected_segment}")
                     st.plotly_chart(fig_box, use_container_width=True)
                 else:
                     st.warning("No new customers found in the current data selection.")
             else:
-                segment_rfm = rfm[rfm['Segment'] == selected_segment]
-                
-                fig_box = go.Figure()
-                fig_box.add_trace(go.Box(y=segment_rfm['Recency'], name="Recency"))
-                fig_box.add_trace(go.Box(y=segment_rfm['Frequency'], name="Frequency"))
-                fig_box.add_trace(go.Box(y=segment_rfm['Monetary'], name="Monetary"))
+                fig_box = quantile_box(summary['segment_quantiles'].loc[selected_segment])
                 fig_box.update_layout(title=f"Distribution of RFM Metrics for {selected_segment}")
                 st.plotly_chart(fig_box, use_container_width=True)
         except Exception as e:
@@ -671,7 +811,7 @@ def main():
         if selected_segment == 'New Customers' and 'New Customers' not in segment_metrics['Segment'].values:
             st.subheader("New Customer Data")
             
-            if len(new_customers) > 0:
+            if new_customers_count > 0:
                 #display first 50 rows as HTML
                 rfm_html = new_customers.head(50).to_html(index=False)
                 st.markdown(rfm_html, unsafe_allow_html=True)
@@ -691,8 +831,21 @@ def main():
             else:
                 st.info("No new customer data available to display.")
 
-    #about Tab
+    #trends tab
     with tab4:
+        st.subheader("Segment Trends")
+
+        if backend == DUCKDB_BACKEND:
+            st.info("Segment trends need the transactions in memory. Switch to the pandas backend to view them.")
+        else:
+            trends_tab(filtered_df)
+
+    #multi-store tab
+    with tab5:
+        multi_store_tab()
+
+    #about Tab
+    with tab6:
         st.title("About RFM Analysis")
         st.markdown("""
         This section provides information about RFM analysis, its benefits, and how to use this dashboard.
@@ -750,7 +903,7 @@ def main():
             - Make sure your date format is consistent
             - Transaction amounts should be numeric (no currency symbols in the data)
             - The system identifies unique customers by Invoice ID
-            - Additional columns in your CSV will be preserved but not used in the RFM calculation
+            - Additional columns in your CSV are ignored, only the columns above are loaded
             - For best results, include at least 3 months of transaction data
             
             You can download a sample template below to help format your data correctly.
@@ -0,0 +1,160 @@
+# batch RFM scoring of one transactions file per store, in a worker pool
+import io
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+import numpy as np
+from rfm import compute_rfm, METRICS
+from schema import read_transactions
+
+#log-spaced Monetary histogram edges, 160 bins per decade so each bin is about 1.45% wide
+MONETARY_EDGES = np.geomspace(0.01, 1e8, 1601)
+
+#most worker processes started per batch, each one loads its own pandas
+MAX_WORKERS = 4
+
+#global quantiles used for the cross-store quartile scores
+QUARTILES = [0.25, 0.5, 0.75]
+
+
+#mergeable per-store statistics: exact integer histograms for Recency/Frequency, binned Monetary
+def metric_histograms(rfm):
+    monetary_bins = np.clip(np.searchsorted(MONETARY_EDGES, rfm['Monetary'].to_numpy(), side='right') - 1,
+                            0, len(MONETARY_EDGES) - 2)
+    return {
+        'Recency': np.bincount(rfm['Recency'].to_numpy(dtype=np.int64)),
+        'Frequency': np.bincount(rfm['Frequency'].to_numpy(dtype=np.int64)),
+        'Monetary': np.bincount(monetary_bins, minlength=len(MONETARY_EDGES) - 1),
+    }
+
+
+#element-wise sum of histograms with different lengths
+def merge_histograms(histograms):
+    merged = np.zeros(max([len(histogram) for histogram in histograms], default=0), dtype=np.int64)
+    for histogram in histograms:
+        merged[:len(histogram)] += histogram
+    return merged
+
+
+#quantiles of a merged histogram, bin i covering value i for integer metrics
+def histogram_quantiles(histogram, quantiles, edges=None):
+    if histogram.sum() == 0:
+        return np.full(len(quantiles), np.nan)
+    cumulative = np.cumsum(histogram)
+    positions = np.searchsorted(cumulative, np.asarray(quantiles) * cumulative[-1], side='left')
+    if edges is None:
+        return positions.astype(float)
+    #log-space midpoint of the Monetary bin holding the quantile, within about 0.7% of the true value
+    return np.sqrt(edges[positions] * edges[positions + 1])
+
+
+#per-store aggregates that can be combined without the raw rows
+def store_summary(rfm):
+    return rfm.groupby('Segment').agg(
+        Customers=('Invoice ID', 'size'),
+        Recency=('Recency', 'sum'),
+        Frequency=('Frequency', 'sum'),
+        Monetary=('Monetary', 'sum'),
+    )
+
+
+#score one store file, run inside a worker process
+def score_store(store, source):
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    rfm = compute_rfm(read_transactions(source))
+    return store, rfm, store_summary(rfm), metric_histograms(rfm)
+
+
+#1-4 quartile score against the global quantile edges, 4 is best
+def quartile_scores(values, edges, reverse=False):
+    scores = np.searchsorted(edges, values, side='left') + 1
+    return 5 - scores if reverse else scores
+
+
+#customers, averages and segment counts from summed per-segment totals, averages are NaN for empty stores
+def _summary_row(summary):
+    customers = summary['Customers'].sum()
+    row = {'Customers': int(customers)}
+    for metric in METRICS:
+        row[f'Avg {metric}'] = summary[metric].sum() / customers if customers else np.nan
+    row.update(summary['Customers'].astype(int).to_dict())
+    return row
+
+
+#segment count columns of a score_batch summary
+def segment_columns(summary):
+    return [column for column in summary.columns if column != 'Customers' and not column.startswith('Avg ')]
+
+
+#score every store, returning per-store rfm tables and a merged cross-store summary,
+#workers are spawned rather than forked so they do not inherit the caller's threads
+def score_batch(sources, max_workers=None):
+    if max_workers is None:
+        max_workers = max(min(len(sources), os.cpu_count() or 1, MAX_WORKERS), 1)
+    stores = {}
+    summaries = {}
+    histograms = {metric: [] for metric in METRICS}
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(score_store, store, source) for store, source in sources.items()]
+        for future in futures:
+            store, rfm, summary, store_histograms = future.result()
+            stores[store] = rfm
+            summaries[store] = summary
+            #stores without rows are reported with 0 customers but add nothing to the global bins
+            if rfm.empty:
+                continue
+            for metric in METRICS:
+                histograms[metric].append(store_histograms[metric])
+
+    if not any(histograms.values()):
+        raise ValueError("None of the store files contain any transactions.")
+
+    #global quartile edges from the merged histograms
+    edges = {
+        'Recency': histogram_quantiles(merge_histograms(histograms['Recency']), QUARTILES),
+        'Frequency': histogram_quantiles(merge_histograms(histograms['Frequency']), QUARTILES),
+        'Monetary': histogram_quantiles(merge_histograms(histograms['Monetary']), QUARTILES, MONETARY_EDGES),
+    }
+    for rfm in stores.values():
+        rfm['R_Quartile'] = quartile_scores(rfm['Recency'], edges['Recency'], reverse=True)
+        rfm['F_Quartile'] = quartile_scores(rfm['Frequency'], edges['Frequency'])
+        rfm['M_Quartile'] = quartile_scores(rfm['Monetary'], edges['Monetary'])
+
+    #one row per store plus an all-stores row, combined from the per-store summaries
+    rows = {store: _summary_row(summary) for store, summary in summaries.items()}
+    rows['All Stores'] = _summary_row(pd.concat(summaries.values()).groupby(level=0).sum())
+    summary = pd.DataFrame.from_dict(rows, orient='index')
+    segments = segment_columns(summary)
+    summary[segments] = summary[segments].fillna(0).astype(int)
+    summary.index.name = 'Store'
+    return stores, summary, pd.DataFrame(edges, index=[f'{quantile:.0%}' for quantile in QUARTILES])
+
+
+#store name -> source, repeated names numbered 'name (2)', 'name (3)', ... so no file is dropped
+def unique_sources(store_sources):
+    sources = {}
+    for store, source in store_sources:
+        name, copy = store, 1
+        while name in sources:
+            copy += 1
+            name = f"{store} ({copy})"
+        sources[name] = source
+    return sources
+
+
+#(store name, path) for every CSV file in a directory, names repeat when only the extension case differs
+def directory_files(directory):
+    files = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name.lower().endswith('.csv') and os.path.isfile(path):
+            files.append((os.path.splitext(name)[0], path))
+    return files
+
+
+#store name -> path for every CSV file in a directory
+def directory_sources(directory):
+    return unique_sources(directory_files(directory))
@@ -0,0 +1,187 @@
+# benchmarks for the RFM pipeline, run with: python benchmark.py
+import os
+import tempfile
+import time
+import pandas as pd
+import numpy as np
+from rfm import compute_rfm, rfm_trend, rfm_trend_naive
+from batch import score_batch, score_store, directory_sources
+from rfm_sql import compute_rfm_sql, DUCKDB_AVAILABLE
+from schema import memory_bytes, read_transactions
+
+
+#synthetic supermarket_sales-style transactions
+def make_transactions(n_rows, n_customers, days=365, seed=42):
+    rng = np.random.default_rng(seed)
+    customer_ids = np.array([f"{i:03d}-{i // 1000:02d}-{i % 10000:04d}" for i in range(n_customers)])
+    return pd.DataFrame({
+        'Invoice ID': customer_ids[rng.integers(0, n_customers, n_rows)],
+        'Date': pd.Timestamp('2019-01-01') + pd.to_timedelta(rng.integers(0, days, n_rows), unit='D'),
+        'Total': rng.gamma(2.0, 150.0, n_rows).round(4),
+    })
+
+
+#synthetic transactions with every supermarket_sales column in pandas default dtypes
+def make_sales(n_rows, seed=42):
+    rng = np.random.default_rng(seed)
+    transactions = make_transactions(n_rows, max(n_rows // 10, 1), seed=seed)
+    unit_price = rng.uniform(10, 100, n_rows).round(2)
+    quantity = rng.integers(1, 11, n_rows)
+    cogs = unit_price * quantity
+    branch = rng.integers(0, 3, n_rows)
+    return pd.DataFrame({
+        'Invoice ID': transactions['Invoice ID'].to_numpy(dtype=object),
+        'Branch': np.array(['A', 'B', 'C'], dtype=object)[branch],
+        'City': np.array(['Yangon', 'Mandalay', 'Naypyitaw'], dtype=object)[branch],
+        'Customer type': np.array(['Member', 'Normal'], dtype=object)[rng.integers(0, 2, n_rows)],
+        'Gender': np.array(['Female', 'Male'], dtype=object)[rng.integers(0, 2, n_rows)],
+        'Product line': np.array(['Health and beauty', 'Electronic accessories', 'Home and lifestyle',
+                                  'Sports and travel', 'Food and beverages', 'Fashion accessories'],
+                                 dtype=object)[rng.integers(0, 6, n_rows)],
+        'Unit price': unit_price,
+        'Quantity': quantity,
+        'Tax 5%': cogs * 0.05,
+        'Total': cogs * 1.05,
+        'Date': transactions['Date'],
+        'Time': pd.Series(rng.integers(10 * 60, 21 * 60, n_rows)).map(lambda m: f"{m // 60}:{m % 60:02d}").to_numpy(dtype=object),
+        'Payment': np.array(['Ewallet', 'Cash', 'Credit card'], dtype=object)[rng.integers(0, 3, n_rows)],
+        'cogs': cogs,
+        'gross margin percentage': np.full(n_rows, 4.761904762),
+        'gross income': cogs * 0.05,
+        'Rating': rng.uniform(4, 10, n_rows).round(1),
+    })
+
+
+#time a function call, best of repeat runs
+def timed(func, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+#the single sweep must give the same snapshots, RFM and segments as recomputing at every snapshot
+def check_trend_parity(df, freq):
+    keys = ['Snapshot', 'Invoice ID']
+    expected = rfm_trend_naive(df, freq).sort_values(keys).reset_index(drop=True)
+    #rfm_trend labels are categoricals, compare them as plain strings
+    actual = rfm_trend(df, freq)
+    actual = actual.astype({column: object for column in actual.columns if actual[column].dtype == 'category'})
+    actual = actual.sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False)
+
+
+#single-sweep trend vs recomputing RFM at every snapshot
+def benchmark_trend():
+    print("RFM trend: single sweep vs per-snapshot recompute")
+    for n_rows, n_customers in [(10_000, 1_000), (100_000, 10_000), (1_000_000, 50_000)]:
+        df = make_transactions(n_rows, n_customers)
+        for label, freq in [("Weekly", "W"), ("Monthly", "M")]:
+            check_trend_parity(df, freq)
+            sweep_time, _ = timed(rfm_trend, df, freq)
+            naive_time, _ = timed(rfm_trend_naive, df, freq)
+            print(f"  {n_rows:>9,} rows {label:<8} sweep {sweep_time:7.3f}s  naive {naive_time:7.3f}s  "
+                  f"speedup {naive_time / sweep_time:5.1f}x  (parity ok)")
+
+
+#memory of pd.read_csv defaults vs read_transactions on the same CSV files,
+#read in 1M-row files so the 10M-row total fits in RAM
+def benchmark_memory(chunk_rows=1_000_000, n_chunks=10):
+    print("Transactions memory: pd.read_csv defaults vs read_transactions")
+    default_bytes = all_columns_bytes = rfm_columns_bytes = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for seed in range(n_chunks):
+            csv_path = os.path.join(tmp, "sales.csv")
+            sales = make_sales(chunk_rows, seed=seed)
+            sales.assign(Date=sales['Date'].dt.strftime('%m/%d/%Y')).to_csv(csv_path, index=False)
+            del sales
+
+            df = pd.read_csv(csv_path)
+            df['Date'] = pd.to_datetime(df['Date'])
+            default_bytes += memory_bytes(df)
+            del df
+            all_columns_bytes += memory_bytes(read_transactions(csv_path, columns=None))
+            rfm_columns_bytes += memory_bytes(read_transactions(csv_path))
+
+            n_rows = (seed + 1) * chunk_rows
+            if seed == 0 or seed == n_chunks - 1:
+                print(f"  {n_rows:>10,} rows  default {default_bytes / 2**20:8.1f} MiB  "
+                      f"all columns {all_columns_bytes / 2**20:8.1f} MiB ({default_bytes / all_columns_bytes:4.1f}x)  "
+                      f"RFM columns only {rfm_columns_bytes / 2**20:8.1f} MiB ({default_bytes / rfm_columns_bytes:4.1f}x)")
+
+
+#pandas path as run by the dashboard: load, filter, compute
+def pandas_rfm(path, date_range, amount_range):
+    df = read_transactions(path)
+    filtered_df = df[
+        (df['Date'] >= pd.to_datetime(date_range[0])) &
+        (df['Date'] <= pd.to_datetime(date_range[1])) &
+        (df['Total'].between(amount_range[0], amount_range[1]))
+    ]
+    return compute_rfm(filtered_df)
+
+
+#DuckDB must give the same rfm frame and segments as the pandas path
+def check_sql_parity(csv_path, parquet_path, date_range, amount_range):
+    expected = pandas_rfm(csv_path, date_range, amount_range).sort_values('Invoice ID').reset_index(drop=True)
+    for path in [csv_path, parquet_path]:
+        actual = compute_rfm_sql(path, date_range, amount_range)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+#in-memory pandas vs DuckDB over CSV and Parquet files on disk
+def benchmark_backends():
+    print("RFM backends: pandas in-memory vs DuckDB on disk")
+    if not DUCKDB_AVAILABLE:
+        print("  skipped, duckdb is not installed")
+        return
+    import duckdb
+
+    date_range = ('2019-02-01', '2019-11-30')
+    amount_range = (10.0, 1000.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in [100_000, 1_000_000]:
+            csv_path = os.path.join(tmp, f"sales_{n_rows}.csv")
+            parquet_path = os.path.join(tmp, f"sales_{n_rows}.parquet")
+            sales = make_sales(n_rows)
+            sales.assign(Date=sales['Date'].dt.strftime('%m/%d/%Y')).to_csv(csv_path, index=False)
+            with duckdb.connect() as con:
+                con.execute("SET enable_progress_bar = false")
+                con.execute(f"COPY (SELECT * FROM read_csv('{csv_path}')) TO '{parquet_path}' (FORMAT PARQUET)")
+            del sales
+
+            check_sql_parity(csv_path, parquet_path, date_range, amount_range)
+            pandas_time, _ = timed(pandas_rfm, csv_path, date_range, amount_range)
+            csv_time, _ = timed(compute_rfm_sql, csv_path, date_range, amount_range)
+            parquet_time, _ = timed(compute_rfm_sql, parquet_path, date_range, amount_range)
+            print(f"  {n_rows:>9,} rows  pandas CSV {pandas_time:7.3f}s  DuckDB CSV {csv_time:7.3f}s  "
+                  f"DuckDB Parquet {parquet_time:7.3f}s  (parity ok)")
+
+
+#one file at a time in-process vs score_batch's worker pool, on 100 synthetic store files
+def benchmark_batch(n_stores=100, rows_per_store=20_000):
+    print(f"Batch scoring: {n_stores} store files of {rows_per_store:,} rows, {os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp:
+        for store in range(n_stores):
+            make_transactions(rows_per_store, rows_per_store // 10, seed=store).to_csv(
+                os.path.join(tmp, f"store_{store:03d}.csv"), index=False
+            )
+        sources = directory_sources(tmp)
+        total_rows = n_stores * rows_per_store
+
+        sequential_time, _ = timed(lambda: [score_store(store, path) for store, path in sources.items()], repeat=1)
+        for workers in sorted({1, os.cpu_count()}):
+            pool_time, _ = timed(score_batch, sources, workers, repeat=1)
+            print(f"  {workers:>2} workers  {pool_time:7.3f}s  {n_stores / pool_time:6.1f} files/s  "
+                  f"{total_rows / pool_time / 1e6:5.2f}M rows/s")
+        print(f"  sequential  {sequential_time:7.3f}s  {n_stores / sequential_time:6.1f} files/s  "
+              f"{total_rows / sequential_time / 1e6:5.2f}M rows/s")
+
+
+if __name__ == "__main__":
+    benchmark_trend()
+    benchmark_memory()
+    benchmark_backends()
+    benchmark_batch()
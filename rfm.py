@@ -0,0 +1,213 @@
+# RFM calculation shared by the dashboard and the benchmark script
+import pandas as pd
+import numpy as np
+
+#bins
+RECENCY_BINS = [0, 30, 90, 180, 365]
+FREQUENCY_BINS = [1, 2, 5, 10, 20]
+MONETARY_BINS = [0, 500, 1000, 5000, 10000]
+
+#labels
+RECENCY_LABELS = ['1', '2', '3', '4']
+FREQUENCY_LABELS = ['4', '3', '2', '1']
+MONETARY_LABELS = ['4', '3', '2', '1']
+
+#RFM metric columns
+METRICS = ['Recency', 'Frequency', 'Monetary']
+
+#quantiles kept per segment for the box plots
+SUMMARY_QUANTILES = [0, 0.25, 0.5, 0.75, 1]
+
+#number of RFM scores shown separately in the score distribution
+TOP_SCORES = 7
+
+#snapshot frequencies for trend mode
+SNAPSHOT_FREQUENCIES = {"Weekly": "W", "Monthly": "M"}
+
+#segment label for customers with no transactions yet at a snapshot, state is cumulative so nobody leaves
+NOT_YET_SEEN = 'Not Yet Seen'
+
+
+#bin position of each value, 0 for values outside the bins ('Other')
+def _bin(values, bins):
+    positions = pd.cut(values, bins=bins, labels=False, include_lowest=True)
+    return np.nan_to_num(np.asarray(positions, dtype=float), nan=-1).astype(np.int64) + 1
+
+
+#label of each code, as a categorical or as plain strings
+def _labels(codes, labels, categorical):
+    if categorical:
+        return pd.Categorical.from_codes(codes, categories=labels)
+    return np.array(labels, dtype=object)[codes]
+
+
+#R, F, M scores and customer segment for an rfm frame, categorical labels when asked
+def score_rfm(rfm, categorical=False):
+    r_bin = _bin(rfm['Recency'], RECENCY_BINS)
+    f_bin = _bin(rfm['Frequency'], FREQUENCY_BINS)
+    m_bin = _bin(rfm['Monetary'], MONETARY_BINS)
+
+    #lookups indexed by bin position, avoiding per-row string parsing
+    r_labels = ['Other'] + RECENCY_LABELS
+    f_labels = ['Other'] + FREQUENCY_LABELS
+    m_labels = ['Other'] + MONETARY_LABELS
+    rfm['R'] = _labels(r_bin, r_labels, categorical)
+    rfm['F'] = _labels(f_bin, f_labels, categorical)
+    rfm['M'] = _labels(m_bin, m_labels, categorical)
+
+    #RFM combined score
+    score_labels = [r + f + m for r in r_labels for f in f_labels for m in m_labels]
+    rfm['RFM_Score'] = _labels((r_bin * len(f_labels) + f_bin) * len(m_labels) + m_bin, score_labels, categorical)
+
+    #'Other' scores count as 0
+    r_score = np.array([0] + [int(label) for label in RECENCY_LABELS])[r_bin]
+    f_score = np.array([0] + [int(label) for label in FREQUENCY_LABELS])[f_bin]
+    m_score = np.array([0] + [int(label) for label in MONETARY_LABELS])[m_bin]
+
+    #Loyal Customers, At Risk, New Customers, in priority order
+    conditions = [
+        (r_score >= 2) & (f_score >= 3) & (m_score >= 3),
+        (r_score <= 2) & (f_score >= 2),
+        rfm['Frequency'].to_numpy() <= 2,
+    ]
+    segments = ['Loyal Customers', 'At Risk', 'New Customers', 'Others']
+    rfm['Segment'] = _labels(np.select(conditions, [0, 1, 2], default=3), segments, categorical)
+    return rfm
+
+
+#RFM per Invoice ID as of current_date (defaults to the latest transaction)
+def compute_rfm(df, current_date=None):
+    if current_date is None:
+        current_date = df['Date'].max()
+
+    grouped = df.groupby('Invoice ID', sort=False).agg(
+        LastDate=('Date', 'max'),
+        Frequency=('Date', 'size'),
+        Monetary=('Total', 'sum'),
+    )
+    rfm = pd.DataFrame({
+        'Invoice ID': grouped.index,
+        'Recency': (current_date - grouped['LastDate']).dt.days.to_numpy(),
+        'Frequency': grouped['Frequency'].to_numpy(),
+        'Monetary': grouped['Monetary'].to_numpy(),
+    })
+    return score_rfm(rfm)
+
+
+#as-of dates at the end of every week/month in the range, including periods with no transactions,
+#the last one clipped to the latest transaction
+def snapshot_dates(dates, freq='M'):
+    last_date = dates.max().normalize()
+    period_ends = pd.period_range(dates.min(), last_date, freq=freq).end_time.normalize()
+    return period_ends.where(period_ends <= last_date, last_date)
+
+
+#RFM and segment at every snapshot in one sorted sweep over the transactions
+def rfm_trend(df, freq='M'):
+    data = df[['Invoice ID', 'Date', 'Total']].sort_values('Date', kind='stable')
+    codes, customers = pd.factorize(data['Invoice ID'])
+    days = data['Date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    totals = data['Total'].to_numpy(dtype=float)
+
+    snapshots = snapshot_dates(data['Date'], freq)
+    snapshot_days = snapshots.to_numpy().astype('datetime64[D]').astype(np.int64)
+    bounds = np.searchsorted(days, snapshot_days, side='right')
+
+    #cumulative per-customer state
+    n_customers = len(customers)
+    last_seen = np.full(n_customers, np.iinfo(np.int64).min, dtype=np.int64)
+    frequency = np.zeros(n_customers, dtype=np.int64)
+    monetary = np.zeros(n_customers)
+
+    frames = []
+    start = 0
+    for snapshot, snapshot_day, stop in zip(snapshots, snapshot_days, bounds):
+        #fold in the transactions since the previous snapshot
+        chunk = codes[start:stop]
+        frequency += np.bincount(chunk, minlength=n_customers)
+        monetary += np.bincount(chunk, weights=totals[start:stop], minlength=n_customers)
+        np.maximum.at(last_seen, chunk, days[start:stop])
+        start = stop
+
+        active = np.flatnonzero(frequency)
+        frames.append(pd.DataFrame({
+            'Snapshot': snapshot,
+            'Invoice ID': pd.Categorical.from_codes(active, categories=customers),
+            'Recency': snapshot_day - last_seen[active],
+            'Frequency': frequency[active],
+            'Monetary': monetary[active],
+        }))
+
+    return score_rfm(pd.concat(frames, ignore_index=True), categorical=True)
+
+
+#same output as rfm_trend, recomputing the full RFM at every snapshot
+def rfm_trend_naive(df, freq='M'):
+    frames = []
+    for snapshot in snapshot_dates(df['Date'], freq):
+        rfm = compute_rfm(df[df['Date'] <= snapshot], current_date=snapshot)
+        rfm.insert(0, 'Snapshot', snapshot)
+        frames.append(rfm)
+    return pd.concat(frames, ignore_index=True)
+
+
+#segment per Invoice ID at one snapshot, as plain strings
+def _snapshot_segments(trend, snapshot):
+    rows = trend.loc[trend['Snapshot'] == snapshot]
+    return pd.Series(rows['Segment'].astype(str).to_numpy(), index=rows['Invoice ID'].astype(str).to_numpy())
+
+
+#segment transition counts between two snapshots of an rfm_trend frame
+def segment_transitions(trend, from_snapshot, to_snapshot):
+    before = _snapshot_segments(trend, from_snapshot)
+    after = _snapshot_segments(trend, to_snapshot)
+    both = pd.concat([before.rename('From'), after.rename('To')], axis=1).fillna(NOT_YET_SEEN)
+    return pd.crosstab(both['From'], both['To'])
+
+
+#counts and means per group of the summary cells, in group order
+def _rollup(cells, by):
+    totals = cells.groupby(by)[['Count'] + METRICS].sum()
+    totals[METRICS] = totals[METRICS].div(totals['Count'], axis=0)
+    return totals
+
+
+#group counts largest first, like value_counts
+def _counts(cells, by):
+    return _rollup(cells, by)['Count'].sort_values(ascending=False, kind='stable')
+
+
+#segment, score and global aggregates shared by every dashboard tab
+def summarize_rfm(rfm):
+    #one grouped pass over the rows, every count and mean rolls up from these cells
+    is_new = (rfm['Frequency'] <= 2).rename('New')
+    cells = rfm.groupby(['Segment', 'R', 'F', 'M', is_new]).agg(
+        Count=('Recency', 'size'),
+        Recency=('Recency', 'sum'),
+        Frequency=('Frequency', 'sum'),
+        Monetary=('Monetary', 'sum'),
+    ).reset_index()
+    cells['RFM_Score'] = cells['R'] + cells['F'] + cells['M']
+
+    #top scores plus everything else as 'Other Scores'
+    score_counts = _counts(cells, 'RFM_Score')
+    score_groups = score_counts.head(TOP_SCORES)
+    if len(score_counts) > TOP_SCORES:
+        score_groups = pd.concat([score_groups, pd.Series({'Other Scores': score_counts.iloc[TOP_SCORES:].sum()})])
+    score_groups = score_groups.sort_values(ascending=False, kind='stable')
+
+    #Frequency <= 2 customers, used when no row is in the New Customers segment
+    new_customers = _rollup(cells[cells['New']].assign(Group='New Customers'), 'Group')
+
+    return {
+        'total': _rollup(cells.assign(Group='All'), 'Group').iloc[0],
+        #segments in name order, for the segment selectors and tables
+        'segments': _rollup(cells, 'Segment'),
+        'r_counts': _counts(cells, 'R'),
+        'f_counts': _counts(cells, 'F'),
+        'm_counts': _counts(cells, 'M'),
+        'score_groups': score_groups,
+        'new_customers': new_customers.iloc[0] if len(new_customers) else pd.Series(0, index=['Count'] + METRICS),
+        #quantiles need the row values, so they take a second grouped pass
+        'segment_quantiles': rfm.groupby('Segment')[METRICS].quantile(SUMMARY_QUANTILES),
+    }
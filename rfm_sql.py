@@ -0,0 +1,126 @@
+# out-of-core RFM calculation pushed down to DuckDB, reading CSV/Parquet files on disk
+import pandas as pd
+from rfm import (
+    RECENCY_BINS, FREQUENCY_BINS, MONETARY_BINS,
+    RECENCY_LABELS, FREQUENCY_LABELS, MONETARY_LABELS,
+)
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+DUCKDB_AVAILABLE = duckdb is not None
+
+
+#table function reading the file, CSV columns are read as text and cast explicitly
+def _source_sql(path):
+    quoted = "'" + str(path).replace("'", "''") + "'"
+    if str(path).lower().endswith('.parquet'):
+        return f"read_parquet({quoted})"
+    return f"read_csv({quoted}, all_varchar=true)"
+
+
+#Invoice ID, Date and Total with Date parsed from ISO or month/day/year text,
+#any other Date text fails the query like pd.to_datetime does instead of being dropped as NULL
+def _transactions_sql(path):
+    return f"""
+        SELECT
+            CAST("Invoice ID" AS VARCHAR) AS invoice_id,
+            COALESCE(
+                TRY_CAST("Date" AS DATE),
+                CAST(try_strptime(CAST("Date" AS VARCHAR), '%m/%d/%Y') AS DATE),
+                CASE WHEN "Date" IS NOT NULL
+                    THEN CAST(error('Unrecognised Date value: ' || CAST("Date" AS VARCHAR)) AS DATE)
+                END
+            ) AS date,
+            CAST("Total" AS DOUBLE) AS total
+        FROM {_source_sql(path)}
+    """
+
+
+#CASE expression matching pd.cut(..., include_lowest=True), 'Other' outside the bins
+def _bin_sql(column, bins, labels):
+    cases = [f"WHEN {column} >= {bins[0]} AND {column} <= {bins[1]} THEN '{labels[0]}'"]
+    for low, high, label in zip(bins[1:-1], bins[2:], labels[1:]):
+        cases.append(f"WHEN {column} > {low} AND {column} <= {high} THEN '{label}'")
+    return f"CASE {' '.join(cases)} ELSE 'Other' END"
+
+
+#score as an integer, 'Other' counts as 0
+def _score_sql(column):
+    return f"CASE WHEN {column} = 'Other' THEN 0 ELSE CAST({column} AS INTEGER) END"
+
+
+def _connect():
+    if duckdb is None:
+        raise ImportError("The DuckDB backend needs the duckdb package: pip install duckdb")
+    con = duckdb.connect()
+    con.execute("SET enable_progress_bar = false")
+    return con
+
+
+#min/max Date and Total of a file, for the sidebar filters
+def transaction_bounds(path):
+    with _connect() as con:
+        row = con.execute(f"""
+            SELECT min(date), max(date), min(total), max(total)
+            FROM ({_transactions_sql(path)})
+        """).fetchone()
+    min_date, max_date, min_total, max_total = row
+    return pd.Timestamp(min_date), pd.Timestamp(max_date), min_total, max_total
+
+
+#same rfm frame as rfm.compute_rfm, with filtering, grouping, binning and segments run in DuckDB
+def compute_rfm_sql(path, date_range=None, amount_range=None):
+    conditions = ["TRUE"]
+    params = []
+    if date_range is not None:
+        conditions.append("date BETWEEN ? AND ?")
+        params += [pd.Timestamp(date_range[0]).date(), pd.Timestamp(date_range[1]).date()]
+    if amount_range is not None:
+        conditions.append("total BETWEEN ? AND ?")
+        params += [float(amount_range[0]), float(amount_range[1])]
+
+    query = f"""
+        WITH filtered AS (
+            SELECT * FROM ({_transactions_sql(path)})
+            WHERE {' AND '.join(conditions)}
+        ),
+        grouped AS (
+            SELECT
+                invoice_id,
+                date_diff('day', max(date), (SELECT max(date) FROM filtered)) AS recency,
+                count(*) AS frequency,
+                sum(total) AS monetary
+            FROM filtered
+            GROUP BY invoice_id
+        ),
+        binned AS (
+            SELECT
+                *,
+                {_bin_sql('recency', RECENCY_BINS, RECENCY_LABELS)} AS r,
+                {_bin_sql('frequency', FREQUENCY_BINS, FREQUENCY_LABELS)} AS f,
+                {_bin_sql('monetary', MONETARY_BINS, MONETARY_LABELS)} AS m
+            FROM grouped
+        )
+        SELECT
+            invoice_id AS "Invoice ID",
+            recency AS "Recency",
+            frequency AS "Frequency",
+            monetary AS "Monetary",
+            r AS "R",
+            f AS "F",
+            m AS "M",
+            r || f || m AS "RFM_Score",
+            CASE
+                WHEN {_score_sql('r')} >= 2 AND {_score_sql('f')} >= 3 AND {_score_sql('m')} >= 3 THEN 'Loyal Customers'
+                WHEN {_score_sql('r')} <= 2 AND {_score_sql('f')} >= 2 THEN 'At Risk'
+                WHEN frequency <= 2 THEN 'New Customers'
+                ELSE 'Others'
+            END AS "Segment"
+        FROM binned
+        ORDER BY invoice_id
+    """
+    with _connect() as con:
+        return con.execute(query, params).df()
@@ -0,0 +1,40 @@
+# memory-compact loading of supermarket_sales-style transaction files
+import pandas as pd
+
+#columns needed by the RFM calculation
+RFM_COLUMNS = ['Invoice ID', 'Date', 'Total']
+
+#compact dtypes for the supermarket_sales columns, Total stays float64 because RFM sums it
+SCHEMA = {
+    'Branch': 'category',
+    'City': 'category',
+    'Customer type': 'category',
+    'Gender': 'category',
+    'Product line': 'category',
+    'Unit price': 'float32',
+    'Quantity': 'int16',
+    'Tax 5%': 'float32',
+    'Total': 'float64',
+    'Time': 'category',
+    'Payment': 'category',
+    'cogs': 'float32',
+    'gross margin percentage': 'float32',
+    'gross income': 'float32',
+    'Rating': 'float32',
+}
+
+
+#read a transactions CSV straight into the compact dtypes, only the requested columns (all if None)
+def read_transactions(source, columns=RFM_COLUMNS):
+    df = pd.read_csv(
+        source,
+        usecols=None if columns is None else (lambda column: column in columns),
+        dtype={column: dtype for column, dtype in SCHEMA.items() if columns is None or column in columns},
+    )
+    df['Date'] = pd.to_datetime(df['Date']).dt.normalize()
+    return df
+
+
+#total memory of a frame in bytes, including string contents
+def memory_bytes(df):
+    return int(df.memory_usage(deep=True).sum())